@@ -0,0 +1,192 @@
+# bench_startup.py
+
+# ----------------------------------------
+# Startup benchmark: import time and time to first render per step
+# ----------------------------------------
+
+# Usage: python bench_startup.py [--repeat N] [--rows N]
+#
+# Every measurement runs in a fresh interpreter so it reflects a cold
+# container start. Import times are measured on top of `import streamlit`,
+# which every page pays regardless. Step renders use Streamlit's AppTest
+# harness with a dummy API key; no OpenAI requests are made.
+#
+# Each step is rendered with the session state an analyst has when they
+# reach it (synthetic uploads, unified and scored data, earlier AI output),
+# so the page shows results rather than its empty "press the button" state.
+# Building that state imports pandas before the timer starts, so for steps
+# 2-6 the numbers measure a render with pandas already loaded; the last
+# column lists the heavy modules the render itself had to import.
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).parent
+
+MODULES = ["pandas", "openai", "jobs", "prompts", "structured_outputs"]
+
+STEP_NAMES = [
+    "Upload Data",
+    "Unify Data",
+    "Identify Churn Factors",
+    "Build Prediction Model",
+    "Retention Actions",
+    "Automation Ideas",
+]
+
+# Session state present when an analyst arrives at each step.
+SEEDED_KEYS = {
+    1: [],
+    2: ["braze_df", "stripe_df", "zendesk_df", "unified_df"],
+    3: ["unified_df", "churn_factors_analysis"],
+    4: ["unified_df", "scoring_rules", "scored_df"],
+    5: ["scored_df", "retention_strategies"],
+    6: ["unified_df", "churn_factors_analysis", "scored_df", "retention_strategies", "automation_plan"],
+}
+
+IMPORT_SNIPPET = """
+import json, sys, time
+import streamlit
+started = time.perf_counter()
+__import__(sys.argv[1])
+print(json.dumps({"seconds": time.perf_counter() - started}))
+"""
+
+RENDER_SNIPPET = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+step, rows, keys = int(sys.argv[1]), int(sys.argv[2]), json.loads(sys.argv[3])
+
+
+def seed_state(rows):
+    import pandas as pd
+
+    emails = [f"member{i}@example.com" for i in range(rows)]
+    stripe_df = pd.DataFrame({
+        "customer_id": [f"cus_{i}" for i in range(rows)],
+        "email": emails,
+        "subscription_status": ["canceled" if i % 7 == 0 else "active" for i in range(rows)],
+        "subscription_type": ["annual" if i % 3 == 0 else "monthly" for i in range(rows)],
+        "total_payments": [i % 24 for i in range(rows)],
+        "payment_failures": [i % 4 for i in range(rows)],
+    })
+    braze_df = pd.DataFrame({
+        "email": emails,
+        "percent_emails_clicked": [(i % 10) / 10 for i in range(rows)],
+        "days_since_last_email_click": [i % 180 for i in range(rows)],
+    })
+    zendesk_df = pd.DataFrame({
+        "Requester email": emails,
+        "Number of tickets": [i % 5 for i in range(rows)],
+        "Tags": ["billing" if i % 2 else "login" for i in range(rows)],
+    })
+    unified_df = stripe_df.merge(braze_df, on="email").merge(
+        zendesk_df.rename(columns={
+            "Requester email": "email",
+            "Number of tickets": "number_of_tickets",
+            "Tags": "recent_ticket_issue",
+        }),
+        on="email",
+    )
+    unified_df["churn_status"] = unified_df["subscription_status"].map(
+        lambda x: "Churned" if x == "canceled" else "Active"
+    )
+    scoring_rules = [
+        {"column": "payment_failures", "operator": ">=", "threshold": 2, "weight": 0.3, "rationale": "Billing trouble."},
+        {"column": "percent_emails_clicked", "operator": "<", "threshold": 0.2, "weight": 0.2, "rationale": "Low engagement."},
+        {"column": "days_since_last_email_click", "operator": ">=", "threshold": 90, "weight": 0.25, "rationale": "Gone quiet."},
+    ]
+    scored_df = unified_df[["customer_id", "email", "churn_status"]].copy()
+    scored_df["churn_risk_score"] = [(i % 11) / 10 for i in range(rows)]
+    scored_df["churn_risk_segment"] = [
+        ["Low Risk", "Moderate Risk", "High Risk"][i % 3] for i in range(rows)
+    ]
+    retention_strategies = scored_df[scored_df["churn_status"] == "Active"][["email", "churn_risk_segment"]].copy()
+    retention_strategies["retention_strategy"] = "Personalized outreach"
+    return {
+        "braze_df": braze_df,
+        "stripe_df": stripe_df,
+        "zendesk_df": zendesk_df,
+        "unified_df": unified_df,
+        "churn_factors_analysis": "## Churn factors\\n" + "- Payment failures above 2\\n" * 20,
+        "scoring_rules": scoring_rules,
+        "scored_df": scored_df,
+        "retention_strategies": retention_strategies,
+        "automation_plan": "## Automation plan\\n" + "- Schedule nightly scoring\\n" * 20,
+    }
+
+
+at = AppTest.from_file("streamlit_app.py", default_timeout=60)
+at.secrets["OPENAI_API_KEY"] = "sk-benchmark"
+at.session_state["step"] = step
+if keys:
+    state = seed_state(rows)
+    for key in keys:
+        at.session_state[key] = state[key]
+
+before = {m for m in ("pandas", "openai") if m in sys.modules}
+started = time.perf_counter()
+at.run()
+first_render = time.perf_counter() - started
+
+started = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - started
+
+print(json.dumps({
+    "first_render": first_render,
+    "rerun": rerun,
+    "errors": [str(e.value) for e in at.exception],
+    "imported_by_render": [m for m in ("pandas", "openai") if m in sys.modules and m not in before],
+}))
+"""
+
+
+def run_snippet(code, *args):
+    result = subprocess.run(
+        [sys.executable, "-c", code, *map(str, args)],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_imports(repeat):
+    print(f"Import time on top of streamlit (median of {repeat}, fresh interpreter each):")
+    for module in MODULES:
+        samples = [run_snippet(IMPORT_SNIPPET, module)["seconds"] for _ in range(repeat)]
+        print(f"  {module:<20} {statistics.median(samples) * 1000:8.1f} ms")
+
+
+def bench_renders(repeat, rows):
+    print(f"\nTime to first render per step with {rows} members seeded (median of {repeat}, fresh interpreter each):")
+    print(f"  {'step':<28} {'first render':>12} {'rerun':>10}  imported by render")
+    for step, name in enumerate(STEP_NAMES, start=1):
+        keys = json.dumps(SEEDED_KEYS[step])
+        runs = [run_snippet(RENDER_SNIPPET, step, rows, keys) for _ in range(repeat)]
+        errors = runs[-1]["errors"]
+        first = statistics.median(r["first_render"] for r in runs) * 1000
+        rerun = statistics.median(r["rerun"] for r in runs) * 1000
+        imported = ", ".join(runs[-1]["imported_by_render"]) or "-"
+        label = f"{step}. {name}"
+        print(f"  {label:<28} {first:9.1f} ms {rerun:7.1f} ms  {imported}")
+        for error in errors:
+            print(f"    ❗ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time to first render for each step.")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh-interpreter runs per measurement")
+    parser.add_argument("--rows", type=int, default=500, help="synthetic members seeded for steps 2-6")
+    args = parser.parse_args()
+
+    bench_imports(args.repeat)
+    bench_renders(args.repeat, args.rows)
+
+
+if __name__ == "__main__":
+    main()
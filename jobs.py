@@ -0,0 +1,106 @@
+# jobs.py
+
+# ----------------------------------------
+# Background job queue for heavy workflow steps
+# ----------------------------------------
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Finished jobs nobody has collected are kept this long so a rerun or
+# reconnect can still pick them up; collected jobs are discarded right away.
+JOB_TTL_SECONDS = 60 * 60
+
+
+class JobQueue:
+    """A bounded worker pool shared by every session in the process.
+
+    Jobs are identified by ID so the UI can poll for them across reruns, and
+    only the owner that submitted a job can read it back. The queue records
+    how long each job waited for a worker so the pool can be sized from real
+    traffic.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="churn-job")
+        self._jobs = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner, fn, *args, **kwargs):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = {
+                "owner": owner,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def get(self, job_id, owner):
+        # Someone else's job looks exactly like an unknown one.
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return dict(job) if job and job["owner"] == owner else None
+
+    def discard(self, job_id, owner):
+        """Drop a job and its result; a job that has not started yet is cancelled."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["owner"] != owner:
+                return
+            del self._jobs[job_id]
+            self._futures.pop(job_id).cancel()
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            self._prune()
+            jobs = list(self._jobs.values())
+        queued = [j for j in jobs if j["status"] == "queued"]
+        waits = [j["started_at"] - j["submitted_at"] for j in jobs if j["started_at"] is not None]
+        return {
+            "workers": self.max_workers,
+            "queued": len(queued),
+            "running": sum(1 for j in jobs if j["status"] == "running"),
+            "oldest_queued_wait": max((now - j["submitted_at"] for j in queued), default=0.0),
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "max_wait": max(waits, default=0.0),
+        }
+
+    def _run(self, job_id, fn, args, kwargs):
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            self._jobs[job_id]["status"] = "running"
+            self._jobs[job_id]["started_at"] = time.time()
+        try:
+            result, error, status = fn(*args, **kwargs), None, "done"
+        except Exception as e:
+            result, error, status = None, str(e) or type(e).__name__, "failed"
+        with self._lock:
+            # A job discarded while it ran leaves no result behind.
+            if job_id in self._jobs:
+                self._jobs[job_id].update(
+                    status=status, result=result, error=error, finished_at=time.time()
+                )
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            del self._futures[job_id]
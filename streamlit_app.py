@@ -1,22 +1,175 @@
 import streamlit as st
-import pandas as pd
-from openai import OpenAI
-import re
-from prompts import (
-    CHURN_FACTORS_PROMPT,
-    CHURN_MODEL_PROMPT,
-    RISK_SEGMENTS_ACTIONS_PROMPT,
-    AUTOMATION_IDEAS_PROMPT,
-)
+import time
+import uuid
+from jobs import JobQueue
+
+# pandas, openai and the prompt texts are imported inside the steps that use
+# them, so a rerun only pays for what the current page needs.
 
 st.set_page_config(page_title="Churn Prediction Prototype", layout="wide")
 st.title("🔍 AI-Powered Churn Prediction Prototype")
 
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"], timeout=60.0)
+# How often the status widget of a pending job checks on it. Only the widget
+# reruns; the full page reruns once, when the job has finished.
+JOB_POLL_INTERVAL = 1.0
+
+# Jobs belong to the browser that submitted them. The token is kept in a
+# session cookie so it survives a refresh, but never goes into the URL, so a
+# copied link cannot be used to read another analyst's results.
+OWNER_COOKIE = "churn_job_owner"
+
+# What each job's result is, and the session state it was computed from. A job
+# recovered after a refresh is only collected if those inputs are still there.
+JOB_LABELS = {
+    "unified_df": "the unified dataset",
+    "churn_factors_analysis": "the churn factor analysis",
+    "scoring_rules": "the scoring rules",
+    "scored_df": "the churn scores",
+    "retention_strategies": "the retention strategies",
+    "automation_plan": "the automation recommendations",
+}
+JOB_INPUTS = {
+    "unified_df": ["braze_df", "stripe_df", "zendesk_df"],
+    "churn_factors_analysis": ["unified_df"],
+    "scoring_rules": ["unified_df"],
+    "scored_df": ["unified_df", "scoring_rules"],
+    "retention_strategies": ["scored_df"],
+    "automation_plan": ["churn_factors_analysis", "retention_strategies"],
+}
+
+# Process-wide resources, shared by every session instead of rebuilt per rerun.
+# The client is created on first use; that is often inside a worker thread,
+# where there is no page to draw a spinner on.
+@st.cache_resource(show_spinner=False)
+def get_openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=st.secrets["OPENAI_API_KEY"], timeout=60.0)
+
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(max_workers=int(st.secrets.get("JOB_WORKERS", 4)))
+
+@st.cache_resource
+def get_output_stats():
+    from structured_outputs import StructuredOutputStats
+    return StructuredOutputStats()
+
+job_queue = get_job_queue()
+output_stats = get_output_stats()
+
+def get_owner_token():
+    if "owner_token" not in st.session_state:
+        token = st.context.cookies.get(OWNER_COOKIE)
+        if not token:
+            token = uuid.uuid4().hex
+            st.html(
+                f"<script>document.cookie = '{OWNER_COOKIE}={token}; path=/; SameSite=Strict';</script>",
+                unsafe_allow_javascript=True,
+            )
+        st.session_state.owner_token = token
+    return st.session_state.owner_token
+
+def submit_job(key, fn, *args):
+    """Run fn(*args) on the job queue; its result lands in st.session_state[key]."""
+    job_id = job_queue.submit(get_owner_token(), fn, *args)
+    st.session_state.jobs[key] = job_id
+    # Mirrored into the URL while in flight so a reconnecting browser can pick
+    # the job up again; collect_job removes it once the result is consumed.
+    st.query_params[f"job_{key}"] = job_id
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def job_status(key, spinner_text):
+    job = job_queue.get(st.session_state.jobs.get(key), get_owner_token())
+    if job is None or job["status"] not in ("queued", "running"):
+        # Finished (or gone): rerun the whole page so collect_job picks it up.
+        st.rerun()
+    if job["status"] == "queued":
+        spinner_text = f"⏳ Waiting for a free worker ({job_queue.stats()['queued']} job(s) queued)..."
+    st.info(f"{spinner_text} ({time.time() - job['submitted_at']:.0f}s)")
+
+def collect_job(key, spinner_text=None):
+    """Move a finished job's result into st.session_state[key] and return the job.
+
+    With spinner_text, a job that is still queued or running gets a status
+    widget that polls it, and the rest of the page is not rendered until it
+    finishes; otherwise it is left alone.
+    """
+    job_id = st.session_state.jobs.get(key)
+    if job_id is None:
+        return None
+    job = job_queue.get(job_id, get_owner_token())
+    if job is None:
+        # Expired, submitted to a process that has since restarted, or not ours.
+        del st.session_state.jobs[key]
+        st.query_params.pop(f"job_{key}", None)
+        return None
+    if job["status"] in ("queued", "running"):
+        if spinner_text is None:
+            return None
+        job_status(key, spinner_text)
+        st.stop()
+    # Consumed: a refresh must not load this result back into a new session,
+    # and the queue need not hold on to it any longer.
+    job_queue.discard(job_id, get_owner_token())
+    del st.session_state.jobs[key]
+    st.query_params.pop(f"job_{key}", None)
+    if job["status"] == "done":
+        st.session_state[key] = job["result"]
+    return job
 
 if "step" not in st.session_state:
     st.session_state.step = 1
 
+if "jobs" not in st.session_state:
+    # Issue the owner cookie on the first render, before any rerun can drop it.
+    get_owner_token()
+    # A fresh session may be a reconnect: pick up in-flight jobs by ID, but
+    # only where the state they were computed from survived. Otherwise the
+    # result would later be shown as the answer for newly uploaded data.
+    reloaded_step = st.query_params.get("step", "?")
+    st.session_state.jobs = {
+        name[len("job_"):]: job_id
+        for name, job_id in st.query_params.items() if name.startswith("job_")
+    }
+    for key, job_id in list(st.session_state.jobs.items()):
+        if key in JOB_INPUTS and all(name in st.session_state for name in JOB_INPUTS[key]):
+            collect_job(key)
+            continue
+        job_queue.discard(job_id, get_owner_token())
+        del st.session_state.jobs[key]
+        st.query_params.pop(f"job_{key}", None)
+        if key in JOB_LABELS:
+            st.warning(
+                f"⚠️ The page was reloaded on step {reloaded_step} while {JOB_LABELS[key]} "
+                "was still being generated. The data it was based on did not survive the "
+                "reload, so that result was discarded. Please re-upload your files and run "
+                "the step again."
+            )
+
+# Kept in the URL next to any in-flight job IDs, so a reload knows where it was.
+st.query_params["step"] = str(st.session_state.step)
+
+with st.sidebar:
+    st.subheader("🧵 Background Jobs")
+    stats = job_queue.stats()
+    st.metric("Queue depth", stats["queued"])
+    st.metric("Running", f"{stats['running']} / {stats['workers']} workers")
+    st.metric("Avg wait for a worker", f"{stats['avg_wait']:.1f}s")
+    st.caption(
+        f"Max wait: {stats['max_wait']:.1f}s · "
+        f"Oldest queued job: {stats['oldest_queued_wait']:.1f}s"
+    )
+
+    st.subheader("🧾 Structured Outputs")
+    for schema_name, summary in output_stats.summary().items():
+        st.caption(
+            f"**{schema_name}** · {summary['calls']} call(s) · "
+            f"repair rate {summary['repair_rate']:.0%} · "
+            f"failure rate {summary['failure_rate']:.0%} · "
+            f"avg {summary['avg_latency']:.1f}s "
+            f"(repair adds {summary['avg_repair_latency']:.1f}s)"
+        )
+
 step_names = [
     "Upload Data",
     "Unify Data",
@@ -35,7 +188,7 @@ step_indicator = " > ".join(
 st.markdown(f"### 🧭 Workflow Progress: {step_indicator}")
 
 def ai_call(prompt, system_message="You are an expert assistant."):
-    response = client.chat.completions.create(
+    response = get_openai_client().chat.completions.create(
         model="gpt-4o",
         messages=[
             {"role": "system", "content": system_message},
@@ -44,6 +197,81 @@ def ai_call(prompt, system_message="You are an expert assistant."):
     )
     return response.choices[0].message.content
 
+def structured_ai_call(prompt, system_message, schema_name, schema, validate):
+    from structured_outputs import structured_completion
+    messages = [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": prompt},
+    ]
+    return structured_completion(get_openai_client(), messages, schema_name, schema, validate, output_stats)
+
+# Heavy steps below run on the job queue, so they take plain inputs rather
+# than reading st.session_state.
+def unify_datasets(braze_df, stripe_df, zendesk_df):
+    import pandas as pd
+
+    zendesk_df = zendesk_df.rename(columns={"Requester email": "email"})
+
+    unified_df = pd.merge(
+        stripe_df[[
+            "customer_id", "email", "subscription_status",
+            "subscription_type", "total_payments", "payment_failures"
+        ]],
+        braze_df[[
+            "email", "percent_emails_clicked", "days_since_last_email_click"
+        ]],
+        on="email", how="outer"
+    )
+
+    unified_df = pd.merge(
+        unified_df,
+        zendesk_df[["email", "Number of tickets", "Tags"]],
+        on="email", how="outer"
+    )
+
+    unified_df.rename(columns={
+        "Number of tickets": "number_of_tickets",
+        "Tags": "recent_ticket_issue"
+    }, inplace=True)
+
+    unified_df.fillna({
+        "total_payments": 0,
+        "payment_failures": 0,
+        "percent_emails_clicked": 0,
+        "days_since_last_email_click": 999,
+        "number_of_tickets": 0,
+        "recent_ticket_issue": "unknown",
+        "subscription_status": "unknown",
+        "subscription_type": "unknown"
+    }, inplace=True)
+
+    unified_df["churn_status"] = unified_df["subscription_status"].apply(
+        lambda x: "Churned" if x in ["canceled", "past_due"] else "Active"
+    )
+    return unified_df
+
+def generate_scoring_rules(prompt, system_message):
+    from structured_outputs import SCORING_RULES_SCHEMA, validate_scoring_rules
+    return structured_ai_call(
+        prompt, system_message, "scoring_rules", SCORING_RULES_SCHEMA, validate_scoring_rules
+    )["rules"]
+
+def score_customers(unified_df, scoring_rules):
+    from structured_outputs import apply_scoring_rules
+    df = apply_scoring_rules(unified_df, scoring_rules)
+    return df[['customer_id', 'email', 'churn_status',
+               'churn_risk_score', 'churn_risk_segment']]
+
+def generate_retention_strategies(active_customers_df, prompt, system_message):
+    from structured_outputs import RETENTION_STRATEGIES_SCHEMA, validate_retention_strategies
+    strategies = structured_ai_call(
+        prompt, system_message, "retention_strategies",
+        RETENTION_STRATEGIES_SCHEMA, validate_retention_strategies,
+    )["strategies"]
+    retention_df = active_customers_df[['email', 'churn_risk_segment']].copy()
+    retention_df['retention_strategy'] = retention_df['churn_risk_segment'].map(strategies)
+    return retention_df.reset_index(drop=True)
+
 # STEP 1: Upload Datasets
 if st.session_state.step == 1:
     st.header("📂 Upload Your Datasets")
@@ -58,6 +286,7 @@ if st.session_state.step == 1:
     zendesk_file = st.file_uploader("🎟️ Upload Zendesk CSV", type="csv")
 
     if braze_file and stripe_file and zendesk_file:
+        import pandas as pd
         st.session_state.braze_df = pd.read_csv(braze_file)
         st.session_state.stripe_df = pd.read_csv(stripe_file)
         st.session_state.zendesk_df = pd.read_csv(zendesk_file)
@@ -76,50 +305,19 @@ elif st.session_state.step == 2:
     Using pandas in this step ensured a robust data foundation, allowing AI to shine in subsequent steps — analyzing patterns and providing actionable insights.
     """)
 
+    job = collect_job("unified_df", "🛠️ Unifying datasets using pandas...")
+    if job and job["status"] == "done":
+        st.success("✅ Datasets unified successfully!")
+    elif job:
+        st.error(f"❗ Error unifying datasets: {job['error']}")
+
     if "unified_df" not in st.session_state:
         if st.button("Unify Datasets Now"):
-            with st.spinner("🛠️ Unifying datasets using pandas..."):
-                zendesk_df = st.session_state.zendesk_df.rename(columns={"Requester email": "email"})
-
-                unified_df = pd.merge(
-                    st.session_state.stripe_df[[
-                        "customer_id", "email", "subscription_status",
-                        "subscription_type", "total_payments", "payment_failures"
-                    ]],
-                    st.session_state.braze_df[[
-                        "email", "percent_emails_clicked", "days_since_last_email_click"
-                    ]],
-                    on="email", how="outer"
-                )
-
-                unified_df = pd.merge(
-                    unified_df,
-                    zendesk_df[["email", "Number of tickets", "Tags"]],
-                    on="email", how="outer"
-                )
-
-                unified_df.rename(columns={
-                    "Number of tickets": "number_of_tickets",
-                    "Tags": "recent_ticket_issue"
-                }, inplace=True)
-
-                unified_df.fillna({
-                    "total_payments": 0,
-                    "payment_failures": 0,
-                    "percent_emails_clicked": 0,
-                    "days_since_last_email_click": 999,
-                    "number_of_tickets": 0,
-                    "recent_ticket_issue": "unknown",
-                    "subscription_status": "unknown",
-                    "subscription_type": "unknown"
-                }, inplace=True)
-
-                unified_df["churn_status"] = unified_df["subscription_status"].apply(
-                    lambda x: "Churned" if x in ["canceled", "past_due"] else "Active"
-                )
-
-                st.session_state.unified_df = unified_df
-                st.success("✅ Datasets unified successfully!")
+            submit_job(
+                "unified_df", unify_datasets,
+                st.session_state.braze_df, st.session_state.stripe_df, st.session_state.zendesk_df,
+            )
+            st.rerun()
 
     if "unified_df" in st.session_state:
         st.dataframe(st.session_state.unified_df, use_container_width=True)
@@ -143,6 +341,8 @@ elif st.session_state.step == 2:
 
 # STEP 3: Identify Churn Factors
 elif st.session_state.step == 3:
+    from prompts import CHURN_FACTORS_PROMPT
+
     st.header("📊 Churn Factor Identification")
     st.markdown("""
     In this step, we utilise AI to analyse the unified dataset to clearly identify and rank key factors that predict churn, providing explicit thresholds that indicate increased risk.
@@ -150,12 +350,17 @@ elif st.session_state.step == 3:
     with st.expander("🔍 View the actual AI prompt powering this step"):
         st.code(CHURN_FACTORS_PROMPT, language='markdown')
 
+    job = collect_job("churn_factors_analysis", "🤖 Analyzing churn factors...")
+    if job and job["status"] == "done":
+        st.success("✅ Churn factors identified successfully!")
+    elif job:
+        st.error(f"❗ Error identifying churn factors: {job['error']}")
+
     if "churn_factors_analysis" not in st.session_state:
         if st.button("Identify Churn Factors Now"):
-            with st.spinner("🤖 Analyzing churn factors..."):
-                prompt = f"{CHURN_FACTORS_PROMPT}\n\n### Unified Dataset (CSV):\n{st.session_state.unified_df.to_csv(index=False)}"
-                st.session_state.churn_factors_analysis = ai_call(prompt, "You are a world-class churn analyst with deep expertise in behavioral analytics and customer psychology. Your job is to uncover the hidden patterns that drive member churn, explain your reasoning clearly, and suggest practical insights that can guide real-world retention strategies. Always think step-by-step, prioritize human-understandable insights, and highlight anything unexpected that may be worth further exploration.")
-                st.success("✅ Churn factors identified successfully!")
+            prompt = f"{CHURN_FACTORS_PROMPT}\n\n### Unified Dataset (CSV):\n{st.session_state.unified_df.to_csv(index=False)}"
+            submit_job("churn_factors_analysis", ai_call, prompt, "You are a world-class churn analyst with deep expertise in behavioral analytics and customer psychology. Your job is to uncover the hidden patterns that drive member churn, explain your reasoning clearly, and suggest practical insights that can guide real-world retention strategies. Always think step-by-step, prioritize human-understandable insights, and highlight anything unexpected that may be worth further exploration.")
+            st.rerun()
 
     if "churn_factors_analysis" in st.session_state:
         st.markdown(st.session_state.churn_factors_analysis)
@@ -173,73 +378,59 @@ elif st.session_state.step == 3:
 
 # STEP 4: Build Prediction Model
 elif st.session_state.step == 4:
+    from prompts import CHURN_MODEL_PROMPT
+
     st.header("🧮 Build Churn Prediction Model")
     st.markdown("""
-    In this step, GPT-4o generates Python code to create an interpretable churn scoring model tailored specifically to your dataset.
+    In this step, GPT-4o designs an interpretable, rule-based churn scoring model tailored specifically to your dataset.
 
     **Workflow Explained Clearly:**
-    1. Click **"🛠️ Generate Scoring Logic"**: GPT-4o produces Python code designed specifically for the provided data.
-    2. Click **"▶️ Apply Generated Scoring Logic to Data"**: Executes the displayed Python code to calculate churn risk scores and assign clear risk segments.
+    1. Click **"🛠️ Generate Scoring Logic"**: GPT-4o returns a validated list of scoring rules (column, threshold, weight and rationale) designed specifically for the provided data.
+    2. Click **"▶️ Apply Generated Scoring Logic to Data"**: Applies the displayed rules to calculate churn risk scores and assign clear risk segments.
 
-    **Note:** The Python code displayed is only provided for transparency, allowing verification before application.
+    **Note:** The rules are displayed for transparency, allowing verification before application.
     """)
 
     with st.expander("🔍 View the actual AI prompt powering this step"):
         st.code(CHURN_MODEL_PROMPT, language='markdown')
 
-    if "ai_generated_scoring_code" not in st.session_state:
+    job = collect_job("scoring_rules", "🤖 Generating scoring logic using GPT-4o...")
+    if job and job["status"] == "failed":
+        st.error(f"❗ Error generating scoring logic: {job['error']}")
+        st.warning("🔁 Please regenerate scoring logic.")
+
+    if "scoring_rules" not in st.session_state:
         if st.button("🛠️ Generate Scoring Logic"):
-            with st.spinner("🤖 Generating scoring logic using GPT-4o..."):
-                prompt = f"{CHURN_MODEL_PROMPT}\n\n### Unified Dataset (CSV):\n{st.session_state.unified_df.to_csv(index=False)}"
+            prompt = f"{CHURN_MODEL_PROMPT}\n\n### Unified Dataset (CSV):\n{st.session_state.unified_df.to_csv(index=False)}"
+
+            system_msg = (
+                "You are a senior data scientist with deep expertise in customer churn analytics and behavioral modeling. "
+                "Your job is to design a practical, interpretable, and human-readable scoring model that classifies customers by churn risk. "
+                "Express the model as weighted threshold rules, each with a short rationale. Explicitly state thresholds chosen based on realistic customer behaviors derived from provided data. "
+                "Respond ONLY with JSON matching the provided schema."
+            )
+
+            submit_job("scoring_rules", generate_scoring_rules, prompt, system_msg)
+            st.rerun()
 
-                system_msg = (
-                    "You are a senior data scientist with deep expertise in customer churn analytics and behavioral modeling. "
-                    "Your job is to design a practical, interpretable, and human-readable scoring model that classifies customers by churn risk. "
-                    "Provide production-ready Python code with inline comments clearly explaining each step. Explicitly state thresholds chosen based on realistic customer behaviors derived from provided data. "
-                    "Provide ONLY executable Python code, without markdown fences or explanations."
-                )
+    if "scoring_rules" in st.session_state:
+        import pandas as pd
 
-                ai_code = ai_call(prompt, system_msg)
-                st.session_state.ai_generated_scoring_code = ai_code
+        st.subheader("🔧 AI-Generated Churn Scoring Rules")
+        st.dataframe(pd.DataFrame(st.session_state.scoring_rules), use_container_width=True)
 
-    if "ai_generated_scoring_code" in st.session_state:
-        st.subheader("🔧 AI-Generated Churn Scoring Code")
-        st.code(st.session_state.ai_generated_scoring_code, language='python')
+        job = collect_job("scored_df", "🔄 Applying scoring logic to dataset...")
+        if job and job["status"] == "done":
+            st.success("✅ Churn scoring logic applied successfully!")
+        elif job:
+            st.error(f"❗ Error applying scoring logic: {job['error']}")
 
         if st.button("▶️ Apply Generated Scoring Logic to Data"):
-            with st.spinner("🔄 Applying scoring logic to dataset..."):
-                df = st.session_state.unified_df.copy()
-
-                numeric_cols = ['payment_failures', 'percent_emails_clicked',
-                                'days_since_last_email_click', 'number_of_tickets',
-                                'total_payments']
-                for col in numeric_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-                # Extract clean Python code (remove markdown if present)
-                import re
-
-                code_match = re.search(r'```python\n(.*?)\n```', st.session_state.ai_generated_scoring_code, re.DOTALL)
-                executable_code = code_match.group(1) if code_match else st.session_state.ai_generated_scoring_code
-
-                try:
-                    exec(executable_code, {'df': df, 'pd': pd})
-                except Exception as e:
-                    st.error(f"❗ Error applying scoring logic: {e}")
-                    with st.expander("📄 Debugging - View AI-generated code"):
-                        st.code(executable_code, language='python')
-                    st.warning("🔁 Please regenerate scoring logic or manually correct the displayed Python code.")
-                    st.stop()
-
-                required_cols = ['churn_risk_score', 'churn_risk_segment']
-                for col in required_cols:
-                    if col not in df.columns:
-                        st.error(f"❗ Missing required column: {col}")
-                        st.stop()
-
-                st.session_state.scored_df = df[['customer_id', 'email', 'churn_status',
-                                                 'churn_risk_score', 'churn_risk_segment']]
-                st.success("✅ Churn scoring logic applied successfully!")
+            submit_job(
+                "scored_df", score_customers,
+                st.session_state.unified_df, st.session_state.scoring_rules,
+            )
+            st.rerun()
 
     if "scored_df" in st.session_state:
         active_customers_df = st.session_state.scored_df[
@@ -272,14 +463,16 @@ elif st.session_state.step == 4:
 
 # STEP 5: Retention Actions
 elif st.session_state.step == 5:
+    from prompts import RISK_SEGMENTS_ACTIONS_PROMPT
+
     st.header("📌 Tailored Retention Actions by Risk Segment")
     st.markdown("""
     In this step, GPT-4o takes the churn risk segments you've identified and generates personalized, psychology-driven retention strategies tailored specifically for each risk category (High, Moderate, and Low Risk).
 
     ### 🔍 **Here's exactly what's happening:**
-    1. **Risk Segment Classification:** GPT-4o first confirms each member’s churn risk segment (High, Moderate, or Low).
+    1. **Risk Segment Summary:** GPT-4o receives the number of active members in each churn risk segment (High, Moderate, or Low).
     2. **Personalized Retention Strategies:** AI generates tailored retention actions that leverage behavioral psychology, clearly addressing why each segment might churn and what can persuade them to remain engaged.
-    3. **Downloadable Retention Plan:** After generation, you'll get a downloadable, actionable CSV that clearly matches every member to their recommended retention action.
+    3. **Downloadable Retention Plan:** After generation, you'll get a downloadable, actionable CSV that clearly matches every member to their segment's recommended retention action.
 
     Click **"🚀 Generate Tailored Retention Strategies"** to proceed. You'll receive actionable strategies ready for immediate use.
     """)
@@ -287,37 +480,36 @@ elif st.session_state.step == 5:
     with st.expander("🔍 View the actual AI prompt powering this step"):
         st.code(RISK_SEGMENTS_ACTIONS_PROMPT, language='markdown')
 
+    job = collect_job("retention_strategies", "✨ Generating tailored retention strategies...")
+    if job and job["status"] == "done":
+        st.success("✅ Retention strategies generated successfully!")
+    elif job:
+        st.error(f"❗ Error generating retention strategies: {job['error']}")
+        st.warning("🔁 Please regenerate retention strategies.")
+
     if "retention_strategies" not in st.session_state:
         if st.button("🚀 Generate Tailored Retention Strategies"):
-            with st.spinner("✨ Generating tailored retention strategies..."):
-                active_customers_df = st.session_state.scored_df[
-                    st.session_state.scored_df['churn_status'] == 'Active'
-                ]
-
-                prompt = (
-                    f"{RISK_SEGMENTS_ACTIONS_PROMPT}\n\n"
-                    f"### Scored Dataset (Active Customers Only) (CSV):\n"
-                    f"{active_customers_df[['email', 'churn_risk_segment']].to_csv(index=False)}"
-                )
-
-                ai_response = ai_call(
-                    prompt,
-                    "You are a senior customer retention strategist with expertise in behavioral psychology, customer engagement, and churn prevention. Provide detailed, psychologically informed retention actions tailored precisely to each customer's churn risk segment. Prioritize actionable, personalized strategies clearly differentiated by risk level."
-                )
-
-                try:
-                    from io import StringIO
-                    retention_df = pd.read_csv(StringIO(ai_response))
-                    st.session_state.retention_strategies = retention_df
-                    st.success("✅ Retention strategies generated successfully!")
-                except Exception as e:
-                    st.error(
-                        "❗ The retention strategies generated by AI could not be parsed. "
-                        "Please regenerate or review the raw output below for troubleshooting."
-                    )
-                    with st.expander("📄 View Raw AI Response for Debugging"):
-                        st.text(ai_response)
-                    st.stop()
+            active_customers_df = st.session_state.scored_df[
+                st.session_state.scored_df['churn_status'] == 'Active'
+            ]
+            segment_counts = (
+                active_customers_df['churn_risk_segment'].value_counts()
+                .rename_axis('churn_risk_segment').reset_index(name='members')
+            )
+
+            prompt = (
+                f"{RISK_SEGMENTS_ACTIONS_PROMPT}\n\n"
+                f"### Risk Segments (Active Customers Only) (CSV):\n"
+                f"{segment_counts.to_csv(index=False)}"
+            )
+
+            submit_job(
+                "retention_strategies", generate_retention_strategies,
+                active_customers_df,
+                prompt,
+                "You are a senior customer retention strategist with expertise in behavioral psychology, customer engagement, and churn prevention. Provide detailed, psychologically informed retention actions tailored precisely to each churn risk segment. Prioritize actionable, personalized strategies clearly differentiated by risk level."
+            )
+            st.rerun()
 
     if "retention_strategies" in st.session_state:
         st.subheader("📋 Retention Strategies Table")
@@ -347,6 +539,8 @@ elif st.session_state.step == 5:
 
 # STEP 6: Automation Ideas
 elif st.session_state.step == 6:
+    from prompts import AUTOMATION_IDEAS_PROMPT
+
     st.header("⚙️ Automation Recommendations")
     st.markdown("""
     In this final step, GPT-4o generates practical, actionable recommendations to automate and scale your churn prediction and retention workflow from a prototype into a robust, fully operational system.
@@ -366,16 +560,21 @@ elif st.session_state.step == 6:
     with st.expander("🔍 View the actual AI prompt powering this step"):
         st.code(AUTOMATION_IDEAS_PROMPT, language='markdown')
 
+    job = collect_job("automation_plan", "🤖 Generating automation solutions...")
+    if job and job["status"] == "done":
+        st.success("✅ Automation strategies generated successfully!")
+    elif job:
+        st.error(f"❗ Error generating automation recommendations: {job['error']}")
+
     if "automation_plan" not in st.session_state:
         if st.button("Generate Automation Recommendations"):
-            with st.spinner("🤖 Generating automation solutions..."):
-                context = (
-                    f"Churn Factors Analysis:\n{st.session_state.churn_factors_analysis}\n\n"
-                    f"Retention Strategies:\n{st.session_state.retention_strategies}"
-                )
-                prompt = f"{AUTOMATION_IDEAS_PROMPT}\n\n### Context:\n{context}"
-                st.session_state.automation_plan = ai_call(prompt, "You are a senior automation architect with deep expertise in designing scalable and practical workflow automation solutions. Your task is to carefully recommend detailed, actionable strategies that clearly address technical implementation steps, scalability, reliability, and seamless integration within existing infrastructures. Provide structured, practical, and clear recommendations suitable for immediate consideration and deployment.")
-                st.success("✅ Automation strategies generated successfully!")
+            context = (
+                f"Churn Factors Analysis:\n{st.session_state.churn_factors_analysis}\n\n"
+                f"Retention Strategies:\n{st.session_state.retention_strategies}"
+            )
+            prompt = f"{AUTOMATION_IDEAS_PROMPT}\n\n### Context:\n{context}"
+            submit_job("automation_plan", ai_call, prompt, "You are a senior automation architect with deep expertise in designing scalable and practical workflow automation solutions. Your task is to carefully recommend detailed, actionable strategies that clearly address technical implementation steps, scalability, reliability, and seamless integration within existing infrastructures. Provide structured, practical, and clear recommendations suitable for immediate consideration and deployment.")
+            st.rerun()
 
     if "automation_plan" in st.session_state:
         st.markdown(st.session_state.automation_plan)
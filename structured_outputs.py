@@ -0,0 +1,251 @@
+# structured_outputs.py
+
+# ----------------------------------------
+# JSON-schema structured outputs for Steps 4 and 5
+# ----------------------------------------
+
+import json
+import math
+import operator
+import threading
+import time
+
+SCORING_COLUMNS = [
+    "payment_failures",
+    "percent_emails_clicked",
+    "days_since_last_email_click",
+    "number_of_tickets",
+    "total_payments",
+]
+
+OPERATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+RISK_SEGMENTS = ["High Risk", "Moderate Risk", "Low Risk"]
+
+# Score cutoffs for the segments above; the Step 4 and Step 5 prompts
+# (prompt_templates/churn_model.md, risk_segments_actions.md) state the same values.
+HIGH_RISK_THRESHOLD = 0.75
+MODERATE_RISK_THRESHOLD = 0.4
+
+RULE_FIELDS = ["column", "operator", "threshold", "weight", "rationale"]
+
+SCORING_RULES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "rules": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "column": {"type": "string", "enum": SCORING_COLUMNS},
+                    "operator": {"type": "string", "enum": list(OPERATORS)},
+                    "threshold": {"type": "number"},
+                    "weight": {"type": "number"},
+                    "rationale": {"type": "string"},
+                },
+                "required": RULE_FIELDS,
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["rules"],
+    "additionalProperties": False,
+}
+
+RETENTION_STRATEGIES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "strategies": {
+            "type": "object",
+            "properties": {segment: {"type": "string"} for segment in RISK_SEGMENTS},
+            "required": RISK_SEGMENTS,
+            "additionalProperties": False,
+        },
+    },
+    "required": ["strategies"],
+    "additionalProperties": False,
+}
+
+
+class StructuredOutputError(ValueError):
+    def __init__(self, schema_name, errors):
+        self.schema_name = schema_name
+        self.errors = errors
+        super().__init__(
+            f"{schema_name} output failed validation after a repair attempt: " + "; ".join(errors)
+        )
+
+
+def _is_number(value):
+    # json.loads accepts NaN and Infinity; a NaN threshold would never match.
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_scoring_rules(data):
+    """Return a list of human-readable problems with a scoring rules payload."""
+    if not isinstance(data, dict) or not isinstance(data.get("rules"), list):
+        return ["expected an object with a 'rules' list"]
+    if not data["rules"]:
+        return ["rules: expected at least one rule"]
+
+    errors = []
+    for i, rule in enumerate(data["rules"]):
+        where = f"rules[{i}]"
+        if not isinstance(rule, dict):
+            errors.append(f"{where}: expected an object")
+            continue
+        missing = [field for field in RULE_FIELDS if field not in rule]
+        extra = [field for field in rule if field not in RULE_FIELDS]
+        if missing:
+            errors.append(f"{where}: missing field(s) {', '.join(missing)}")
+        if extra:
+            errors.append(f"{where}: unexpected field(s) {', '.join(extra)}")
+        if "column" in rule and rule["column"] not in SCORING_COLUMNS:
+            errors.append(f"{where}.column: {rule['column']!r} is not one of {', '.join(SCORING_COLUMNS)}")
+        if "operator" in rule and rule["operator"] not in OPERATORS:
+            errors.append(f"{where}.operator: {rule['operator']!r} is not one of {', '.join(OPERATORS)}")
+        if "threshold" in rule and not _is_number(rule["threshold"]):
+            errors.append(f"{where}.threshold: expected a finite number, got {rule['threshold']!r}")
+        if "weight" in rule:
+            if not _is_number(rule["weight"]):
+                errors.append(f"{where}.weight: expected a finite number, got {rule['weight']!r}")
+            elif not 0 < rule["weight"] <= 1:
+                errors.append(f"{where}.weight: {rule['weight']} is outside (0, 1]")
+        if "rationale" in rule and not (isinstance(rule["rationale"], str) and rule["rationale"].strip()):
+            errors.append(f"{where}.rationale: expected a non-empty string")
+    return errors
+
+
+def validate_retention_strategies(data):
+    """Return a list of human-readable problems with a segment→strategy payload."""
+    if not isinstance(data, dict) or not isinstance(data.get("strategies"), dict):
+        return ["expected an object with a 'strategies' object"]
+
+    strategies = data["strategies"]
+    errors = []
+    for segment in RISK_SEGMENTS:
+        if segment not in strategies:
+            errors.append(f"strategies: missing segment {segment!r}")
+        elif not (isinstance(strategies[segment], str) and strategies[segment].strip()):
+            errors.append(f"strategies[{segment!r}]: expected a non-empty string")
+    for segment in strategies:
+        if segment not in RISK_SEGMENTS:
+            errors.append(f"strategies: unexpected segment {segment!r}")
+    return errors
+
+
+def _parse(content, validate):
+    try:
+        data = json.loads(content)
+    except (TypeError, json.JSONDecodeError) as e:
+        return None, [f"response is not valid JSON: {e}"]
+    return data, validate(data)
+
+
+class StructuredOutputStats:
+    """Process-wide counters for structured calls: repair rate and the latency it adds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_schema = {}
+
+    def record(self, schema_name, latency, repair_latency, failed):
+        with self._lock:
+            entry = self._by_schema.setdefault(schema_name, {
+                "calls": 0, "repairs": 0, "failures": 0,
+                "total_latency": 0.0, "total_repair_latency": 0.0,
+            })
+            entry["calls"] += 1
+            entry["failures"] += int(failed)
+            entry["total_latency"] += latency
+            if repair_latency is not None:
+                entry["repairs"] += 1
+                entry["total_repair_latency"] += repair_latency
+
+    def summary(self):
+        with self._lock:
+            entries = {name: dict(entry) for name, entry in self._by_schema.items()}
+        return {
+            name: {
+                "calls": entry["calls"],
+                "repair_rate": entry["repairs"] / entry["calls"],
+                "failure_rate": entry["failures"] / entry["calls"],
+                "avg_latency": entry["total_latency"] / entry["calls"],
+                "avg_repair_latency": (
+                    entry["total_repair_latency"] / entry["repairs"] if entry["repairs"] else 0.0
+                ),
+            }
+            for name, entry in entries.items()
+        }
+
+
+def structured_completion(client, messages, schema_name, schema, validate, stats, model="gpt-4o"):
+    """Request a JSON-schema response, validate it, and repair it at most once."""
+
+    def create(messages):
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "schema": schema, "strict": True},
+            },
+        )
+        return response.choices[0].message.content
+
+    started = time.time()
+    repair_started = None
+    # Stays failed unless validation passes, so API errors (timeouts,
+    # refusals) are counted along with the latency they cost.
+    errors = ["request did not complete"]
+    try:
+        content = create(messages)
+        data, errors = _parse(content, validate)
+
+        if errors:
+            repair_started = time.time()
+            content = create(messages + [
+                {"role": "assistant", "content": content or ""},
+                {"role": "user", "content": (
+                    "Your response failed validation:\n- " + "\n- ".join(errors)
+                    + "\n\nReturn the corrected JSON object only."
+                )},
+            ])
+            data, errors = _parse(content, validate)
+    finally:
+        finished = time.time()
+        repair_latency = finished - repair_started if repair_started is not None else None
+        stats.record(schema_name, finished - started, repair_latency, failed=bool(errors))
+
+    if errors:
+        raise StructuredOutputError(schema_name, errors)
+    return data
+
+
+def apply_scoring_rules(df, rules):
+    """Score members with validated rules, adding churn_risk_score and churn_risk_segment."""
+    import pandas as pd
+
+    df = df.copy()
+    for col in SCORING_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    score = pd.Series(0.0, index=df.index)
+    for rule in rules:
+        matched = OPERATORS[rule["operator"]](df[rule["column"]], rule["threshold"])
+        score += matched.astype(float) * rule["weight"]
+    score = score.clip(upper=1).round(2)
+
+    df["churn_risk_score"] = score
+    df["churn_risk_segment"] = (
+        pd.Series("Low Risk", index=df.index)
+        .mask(score >= MODERATE_RISK_THRESHOLD, "Moderate Risk")
+        .mask(score >= HIGH_RISK_THRESHOLD, "High Risk")
+    )
+    return df